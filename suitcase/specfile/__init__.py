@@ -4,9 +4,11 @@ for the spec file format.
 """
 import event_model
 from datetime import datetime
+import itertools
+import operator
 import os
 from pathlib import Path
-import jinja2
+import time
 import suitcase.utils
 from ._version import get_versions
 
@@ -14,11 +16,10 @@ __version__ = get_versions()['version']
 del get_versions
 
 
-# TODO Just use f-string?
-env = jinja2.Environment()
-
-
 SPEC_TIME_FORMAT = '%a %b %d %H:%M:%S %Y'
+_SPEC_WEEKDAYS = ('Mon', 'Tue', 'Wed', 'Thu', 'Fri', 'Sat', 'Sun')
+_SPEC_MONTHS = ('Jan', 'Feb', 'Mar', 'Apr', 'May', 'Jun',
+                'Jul', 'Aug', 'Sep', 'Oct', 'Nov', 'Dec')
 
 
 def from_spec_time(string_time):
@@ -48,15 +49,37 @@ def to_spec_time(datetime_object):
     str
         The string representation of SPEC time: e.g., Fri Feb 19 14:01:35 2016
     """
-    return datetime_object.strftime(SPEC_TIME_FORMAT)
+    return _format_spec_time(datetime_object.timetuple())
+
+
+def to_spec_time_fast(timestamp):
+    """Convert a Unix timestamp into the SPEC line #D
+
+    This is equivalent to ``to_spec_time(datetime.fromtimestamp(timestamp))``
+    but skips building the intermediate datetime object.
+
+    Parameters
+    ----------
+    timestamp : float
+        Seconds since the epoch, e.g. the 'time' of a RunStart document
+
+    Returns
+    -------
+    str
+        The string representation of SPEC time: e.g., Fri Feb 19 14:01:35 2016
+    """
+    # datetime.fromtimestamp rounds to the nearest microsecond, whereas
+    # time.localtime just drops the fraction; round first to match.
+    return _format_spec_time(time.localtime(round(timestamp, 6)))
 
 
-_SPEC_FILE_HEADER_TEMPLATE = env.from_string("""#F {{ filename }}
-#E {{ unix_time }}
-#D {{ readable_time }}
-#C {{ owner }}  User = {{ owner }}
-#O0 {{ positioner_variable_sources | join ('  ') }}
-#o0 {{ positioner_variable_names | join(' ') }}""")
+def _format_spec_time(tm):
+    # Equivalent to strftime(SPEC_TIME_FORMAT) in the C locale. SPEC always
+    # uses the English day and month abbreviations, so look them up directly
+    # rather than going through the locale-aware strftime.
+    return (f'{_SPEC_WEEKDAYS[tm.tm_wday]} {_SPEC_MONTHS[tm.tm_mon - 1]} '
+            f'{tm.tm_mday:02d} {tm.tm_hour:02d}:{tm.tm_min:02d}:'
+            f'{tm.tm_sec:02d} {tm.tm_year}')
 
 
 _DEFAULT_POSITIONERS = {'data_keys': {}}
@@ -85,21 +108,21 @@ def to_spec_file_header(start, filepath, baseline_descriptor=None):
     """
     if baseline_descriptor is None:
         baseline_descriptor = _DEFAULT_POSITIONERS
-    md = {}
-    md['owner'] = start.get('owner', '')
-    md['positioner_variable_names'] = sorted(
-            list(baseline_descriptor['data_keys'].keys()))
-    md['positioner_variable_sources'] = [
-        baseline_descriptor['data_keys'][k]['source'] for k
-        in md['positioner_variable_names']]
-    md['unix_time'] = int(start['time'])
-    md['readable_time'] = to_spec_time(datetime.fromtimestamp(md['unix_time']))
-    md['filename'] = os.path.basename(filepath)
-    return _SPEC_FILE_HEADER_TEMPLATE.render(md)
-
-
-_SPEC_1D_COMMAND_TEMPLATE = env.from_string(
-    "{{ plan_name }} {{ scan_motor }} {{ start }} {{ stop }} {{ num }} {{ time }}")
+    owner = start.get('owner', '')
+    data_keys = baseline_descriptor['data_keys']
+    positioner_variable_names = sorted(data_keys)
+    positioner_variable_sources = [
+        data_keys[k]['source'] for k in positioner_variable_names]
+    unix_time = int(start['time'])
+    readable_time = to_spec_time_fast(unix_time)
+    filename = os.path.basename(filepath)
+    return (f"#F {filename}\n"
+            f"#E {unix_time}\n"
+            f"#D {readable_time}\n"
+            f"#C {owner}  User = {owner}\n"
+            f"#O0 {'  '.join(map(str, positioner_variable_sources))}\n"
+            f"#o0 {' '.join(positioner_variable_names)}")
+
 
 _SCANS_WITHOUT_MOTORS = {'ct': 'count'}
 _SCANS_WITH_MOTORS = {'ascan': 'scan', 'dscan': 'rel_scan'}
@@ -112,17 +135,6 @@ def get_name(plan_name):
     return _BLUESKY_PLAN_NAMES.get(plan_name, 'Other')
 
 
-_SPEC_SCAN_HEADER_TEMPLATE = env.from_string("""
-
-#S {{ scan_id }} {{ command }}
-#D {{ readable_time }}
-#T {{ acq_time }}  (Seconds)
-#P0 {{ positioner_positions | join(' ')}}
-#N {{ num_columns }}
-#L {{ motor_name }}  Epoch  Seconds  {{ data_keys | join('  ') }}
-""")
-
-
 def _get_acq_time(start, default_value=-1):
     """Private helper function to extract the heuristic count time
 
@@ -170,14 +182,10 @@ def _get_motor_name(start):
 
 
 def _get_motor_position(start, event):
-    plan_name = _get_plan_name(start)
-    # make sure we are trying to get the motor position for an implemented scan
-    if (plan_name not in _SPEC_SCAN_NAMES or
-            plan_name in _SCANS_WITHOUT_MOTORS):
-        return event['seq_num']
     motor_name = _get_motor_name(start)
-    # make sure we have a motor name that we can get data for. Otherwise we use
-    # the sequence number of the event
+    # _get_motor_name falls back to 'seq_num' for scans that are not
+    # implemented or have no motor. In that case we use the sequence number of
+    # the event.
     if motor_name == 'seq_num':
         return event['seq_num']
     # if none of the above conditions are met, we can get a motor value. Thus we
@@ -194,6 +202,20 @@ def _get_scan_data_column_names(start, primary_descriptor):
     return read_fields
 
 
+def _tuple_getter(keys):
+    """Private helper returning a callable that fetches ``keys`` as a tuple
+
+    Unlike ``operator.itemgetter``, the result is always a tuple, even for
+    zero or one key.
+    """
+    if len(keys) > 1:
+        return operator.itemgetter(*keys)
+    if keys:
+        key, = keys
+        return lambda d: (d[key],)
+    return lambda d: ()
+
+
 def to_spec_scan_header(start, primary_descriptor, baseline_event=None):
     """Convert the RunStart, "primary" Descriptor and the "baseline" Event
     into a spec scan header
@@ -217,14 +239,33 @@ def to_spec_scan_header(start, primary_descriptor, baseline_event=None):
         The formatted SPEC scan header. You probably want to split on "\n"
     """
     if baseline_event is None:
-        baseline_event = {
-            'data':
-                {k: -1 for k in _DEFAULT_POSITIONERS['data_keys']}}
-    md = {}
-    md['scan_id'] = start['scan_id']
-    scan_command = _get_plan_name(start)
+        baseline_event = _default_baseline_event()
     motor_name = _get_motor_name(start)
     acq_time = _get_acq_time(start)
+    return _render_scan_header(
+        start['scan_id'],
+        _get_spec_command(start, motor_name, acq_time),
+        to_spec_time_fast(start['time']),
+        acq_time,
+        _format_positioner_positions(baseline_event),
+        motor_name,
+        _get_scan_data_column_names(start, primary_descriptor))
+
+
+def _default_baseline_event():
+    return {'data': {k: -1 for k in _DEFAULT_POSITIONERS['data_keys']}}
+
+
+def _format_positioner_positions(baseline_event):
+    """Private helper to format the #P0 line values of a baseline Event"""
+    data = baseline_event['data']
+    # Sort on the keys alone; sorting the items would compare the values too.
+    return ' '.join(str(data[k]) for k in sorted(data))
+
+
+def _get_spec_command(start, motor_name, acq_time):
+    """Private helper to build the spec command of the #S line"""
+    scan_command = _get_plan_name(start)
     # can only grab start/stop/num if we are a dscan or ascan.
     if (scan_command not in _SPEC_SCAN_NAMES or
             scan_command in _SCANS_WITHOUT_MOTORS):
@@ -240,46 +281,62 @@ def to_spec_scan_header(start, primary_descriptor, baseline_event=None):
 
     command_list = ([scan_command, motor_name] + command_args + [acq_time])
     # have to ensure all list elements are strings or join gets angry
-    md['command'] = ' '.join([str(s) for s in command_list])
-    md['readable_time'] = to_spec_time(datetime.fromtimestamp(start['time']))
-    md['acq_time'] = acq_time
-    md['positioner_positions'] = [
-        v for k, v in sorted(baseline_event['data'].items())]
-    md['data_keys'] = _get_scan_data_column_names(start, primary_descriptor)
-    md['num_columns'] = 3 + len(md['data_keys'])
-    md['motor_name'] = _get_motor_name(start)
-    return _SPEC_SCAN_HEADER_TEMPLATE.render(md)
+    return ' '.join(map(str, command_list))
 
 
-_SPEC_EVENT_TEMPLATE = env.from_string("""
-{{ motor_position }}  {{ unix_time }} {{ acq_time }} {{ values | join(' ') }}""")
+def _render_scan_header(scan_id, command, readable_time, acq_time,
+                        positioner_positions, motor_name, data_keys):
+    """Private helper formatting a spec scan header from its fields
+
+    ``positioner_positions`` is the already-formatted content of the #P0
+    line, as returned by _format_positioner_positions.
+    """
+    num_columns = 3 + len(data_keys)
+    return (f"\n\n#S {scan_id} {command}\n"
+            f"#D {readable_time}\n"
+            f"#T {acq_time}  (Seconds)\n"
+            f"#P0 {positioner_positions}\n"
+            f"#N {num_columns}\n"
+            f"#L {motor_name}  Epoch  Seconds  {'  '.join(data_keys)}")
 
 
 def to_spec_scan_data(start, primary_descriptor, event):
-    md = {}
-    md['unix_time'] = int(event['time'])
-    md['acq_time'] = _get_acq_time(start)
-    md['motor_position'] = _get_motor_position(start, event)
+    unix_time = int(event['time'])
+    acq_time = _get_acq_time(start)
+    motor_position = _get_motor_position(start, event)
     data_keys = _get_scan_data_column_names(start, primary_descriptor)
-    md['values'] = [event['data'][k] for k in data_keys]
-    return _SPEC_EVENT_TEMPLATE.render(md)
+    data = event['data']
+    values = ' '.join(str(data[k]) for k in data_keys)
+    return f"\n{motor_position}  {unix_time} {acq_time} {values}"
+
+
+def _parse_spec_epoch(string_time):
+    return datetime.fromtimestamp(int(string_time))
+
 
+def _parse_spec_hkl(line):
+    return list(map(float, line.split()))
 
-# Dictionary that maps a spec metadata line to a specific lambda function
+
+def _parse_spec_exposure_time(line):
+    # e.g. '1  (Seconds)'
+    return float(line.partition('  ')[0])
+
+
+# Dictionary that maps a spec metadata line to a specific function
 # to parse it. This only works for lines whose contents can be mapped to a
 # single semantic meaning.  e.g., the "spec command" line
 # (ascan start stop step exposure_time) does not map well on to this "single
 # semantic meaning" splitter
 spec_line_parser = {
     '#D': ('time_from_date', from_spec_time),
-    '#E': ('time',
-           lambda x: datetime.fromtimestamp(int(x))),
+    '#E': ('time', _parse_spec_epoch),
     '#F': ('filename', str),
     # The exposure time
     '#N': ('num_intervals', int),
     # The h, k, l coordinates
-    '#Q': ('hkl', lambda x: [float(s) for s in x.split(' ')]),
-    '#T': ('exposure_time', lambda x: float(x.split('  ')[0])),
+    '#Q': ('hkl', _parse_spec_hkl),
+    '#T': ('exposure_time', _parse_spec_exposure_time),
 }
 
 
@@ -308,7 +365,11 @@ def export(gen, directory, file_prefix='{start[uid]}'):
         an instance of ``suitcase.utils.MemoryBufferManager`` and
         ``suitcase.utils.MultiFileManager`` or any object implementing that
         inferface. See the suitcase documentation at
-        https://nsls-ii.github.io/suitcase for details.
+        https://nsls-ii.github.io/suitcase for details. The manager must
+        support binary append ('ab') or, failing that, text append ('a')
+        mode. In binary mode its handles are given bytes, and the specfile is
+        UTF-8 with '\\n' line endings on every platform. In text mode they
+        are given str, and the encoding and line endings are the handle's.
 
     file_prefix : str, optional
         The first part of the filename of the generated output files. This
@@ -351,6 +412,16 @@ def export(gen, directory, file_prefix='{start[uid]}'):
     return serializer.artifacts
 
 
+# Event lines are accumulated and handed to the file in chunks of roughly
+# this many bytes, unless the Serializer was asked to flush every write.
+_WRITE_BUFFER_SIZE = 64 * 1024
+# Everything is encoded up front and written to the specfile in binary mode,
+# so the output is UTF-8 with '\n' line endings regardless of platform or
+# locale. Files from managers that only support text append get it decoded
+# again, and their own encoding and newline translation then apply.
+_ENCODING = 'utf-8'
+
+
 class Serializer(event_model.DocumentRouter):
     """
     Serialize a stream of documents to specfile.
@@ -373,7 +444,11 @@ class Serializer(event_model.DocumentRouter):
         an instance of ``suitcase.utils.MemoryBufferManager`` and
         ``suitcase.utils.MultiFileManager`` or any object implementing that
         interface. See the suitcase documentation at
-        https://nsls-ii.github.io/suitcase for details.
+        https://nsls-ii.github.io/suitcase for details. The manager must
+        support binary append ('ab') or, failing that, text append ('a')
+        mode. In binary mode its handles are given bytes, and the specfile is
+        UTF-8 with '\\n' line endings on every platform. In text mode they
+        are given str, and the encoding and line endings are the handle's.
 
     file_prefix : str, optional
         The first part of the filename of the generated output files. This
@@ -414,22 +489,53 @@ class Serializer(event_model.DocumentRouter):
             # Set up a MultiFileManager for them.
             self._manager = suitcase.utils.MultiFileManager(
                 directory,
-                allowed_modes=('a'))
+                allowed_modes=('a', 'ab'))
         else:
             # The user has given us their own Manager instance. Use that.
             self._manager = directory
 
         self._file = None  # set in start() below
+        self._binary_file = True  # set in start() below
+        self._filepath = None  # set in start() below
+        self._write_buffer = bytearray()
         self.pos_names = ["No", "Positioners", "Were", "Given"]
         self.positions = ["-inf", "-inf", "-inf", "-inf"]
         self._start = None
         self._baseline_descriptor = None
-        self._baseline_event = None
+        # The #P0 line of the scan header, from the latest baseline Event
+        # received before the scan header is written. The default matches
+        # that of to_spec_scan_header.
+        self._baseline_positions = _format_positioner_positions(
+            _default_baseline_event())
         self._primary_descriptor = None
         self._has_not_written_scan_header = True
         self._has_not_written_file_header = True
         self._num_events_received = 0
         self._num_baseline_events_received = 0
+        # These depend only on the RunStart and the primary Descriptor, so
+        # they are computed once, when the first primary Event or EventPage
+        # arrives, rather than for every Event.
+        self._cached_motor_name = None
+        self._cached_acq_time = None
+        self._cached_data_keys = None
+        self._format_event = None  # set in _start_primary_stream() below
+        self._format_event_page = None  # ditto
+        # Map the uid of each known Descriptor to the names of the methods
+        # handling its Events and EventPages. Populated in descriptor() below.
+        # Names rather than bound methods, so as not to reference self.
+        self._event_dispatch = {}
+        self._event_page_dispatch = {}
+
+    # The documents this Serializer handles are dispatched directly in
+    # __call__ below; anything else goes through DocumentRouter.
+    _HANDLED_DOCUMENTS = frozenset(
+        ('start', 'descriptor', 'event', 'event_page', 'stop'))
+
+    def __call__(self, name, doc, validate=False):
+        if validate or name not in self._HANDLED_DOCUMENTS:
+            return super().__call__(name, doc, validate)
+        getattr(self, name)(doc)
+        return name, doc
 
     @property
     def artifacts(self):
@@ -448,6 +554,8 @@ class Serializer(event_model.DocumentRouter):
         """
         Close all of the resources (e.g. files) allocated.
         """
+        if self._file is not None:
+            self._flush_buffer()
         self._manager.close()
 
     def __enter__(self):
@@ -460,32 +568,61 @@ class Serializer(event_model.DocumentRouter):
         """
         Stash the start document and reset the internal state
         """
+        if self._file is not None:
+            # A previous run may have ended without a RunStop. Its lines
+            # belong in its own file, not the one about to be opened.
+            self._flush_buffer()
         self._start = doc
 
+        postfix = f'{self._file_prefix.format(start=doc)}.spec'
         try:
-            self._file = self._manager.open(
-                'stream_data',
-                f'{self._file_prefix.format(start=doc)}.spec', 'a')
-        except suitcase.utils.ModeError as error:
-            raise ValueError(
-                "To write data from multiple runs into the same specfile, "
-                "the Serializer requires a manager that supports append ('a') "
-                "mode.") from error
+            self._file = self._manager.open('stream_data', postfix, 'ab')
+            self._binary_file = True
+        except suitcase.utils.ModeError:
+            # Fall back to text append for managers that do not support
+            # binary append; _flush_buffer decodes before writing.
+            try:
+                self._file = self._manager.open('stream_data', postfix, 'a')
+            except suitcase.utils.ModeError as error:
+                raise ValueError(
+                    "To write data from multiple runs into the same "
+                    "specfile, the Serializer requires a manager that "
+                    "supports append ('ab' or 'a') mode.") from error
+            self._binary_file = False
+        self._filepath = self._manager.artifacts['stream_data'][-1]
         # Use tell() to sort out if this file is empty (i.e. a new file) and
         # therefore whether we need to write the specfile header or not.
         self._has_not_written_file_header = not self._file.tell()
 
+    def _write(self, data):
+        self._write_buffer += data
+        if self._flush or len(self._write_buffer) >= _WRITE_BUFFER_SIZE:
+            self._flush_buffer()
+
+    def _flush_buffer(self):
+        if self._write_buffer:
+            # Hand over an immutable copy: the file handle may keep a
+            # reference to what it is given, and the buffer is reused.
+            data = bytes(self._write_buffer)
+            self._write_buffer.clear()
+            if not self._binary_file:
+                data = data.decode(_ENCODING)
+            self._file.write(data)
+        if self._flush:
+            self._file.flush()
+
     def _write_new_header(self):
-        filepath, = self._manager.artifacts['stream_data']
-        header = to_spec_file_header(self._start, filepath,
+        header = to_spec_file_header(self._start, self._filepath,
                                      self._baseline_descriptor)
-        self._file.write(header)
+        self._write(header.encode(_ENCODING))
 
     def descriptor(self, doc):
         if doc.get('name') == 'baseline':
             # if this is the baseline descriptor, we might need to write a
             # new file header
             self._baseline_descriptor = doc
+            self._event_dispatch[doc['uid']] = '_handle_baseline'
+            self._event_page_dispatch[doc['uid']] = '_handle_baseline_page'
         elif self._primary_descriptor:
             # we already have a primary descriptor, why are we getting
             # another one?
@@ -499,13 +636,69 @@ class Serializer(event_model.DocumentRouter):
             raise NotImplementedError(err_msg)
         else:
             self._primary_descriptor = doc
+            self._event_dispatch[doc['uid']] = '_handle_first_primary'
+            self._event_page_dispatch[doc['uid']] = '_handle_first_primary_page'
+
+    def _make_event_formatter(self):
+        # Build a function that returns the encoded scan data line for one
+        # primary Event, specialized to this run so that the per-Event work
+        # is only looking up and formatting the values. It does not close
+        # over self, so storing it on self creates no reference cycle.
+        get_values = _tuple_getter(self._cached_data_keys)
+        acq_time = self._cached_acq_time
+        motor_name = self._cached_motor_name
+
+        if motor_name == 'seq_num':
+            def format_event(doc):
+                values = ' '.join(map(str, get_values(doc['data'])))
+                return (f"\n{doc['seq_num']}  {int(doc['time'])} {acq_time} "
+                        f"{values}\n".encode(_ENCODING))
+        else:
+            def format_event(doc):
+                data = doc['data']
+                values = ' '.join(map(str, get_values(data)))
+                return (f"\n{data[motor_name]}  {int(doc['time'])} "
+                        f"{acq_time} {values}\n".encode(_ENCODING))
+        return format_event
+
+    def _make_event_page_formatter(self):
+        # Like _make_event_formatter, but formats the scan data lines for all
+        # of the rows of one primary EventPage at once.
+        keys = self._cached_data_keys
+        acq_time = self._cached_acq_time
+        motor_name = self._cached_motor_name
+
+        if motor_name == 'seq_num':
+            def get_positions(doc):
+                return doc['seq_num']
+        else:
+            def get_positions(doc):
+                return doc['data'][motor_name]
+
+        def format_event_page(doc):
+            data = doc['data']
+            positions = get_positions(doc)
+            if keys:
+                rows = zip(*(data[k] for k in keys))
+            else:
+                rows = itertools.repeat(())
+            return ''.join([
+                f"\n{position}  {int(t)} {acq_time} "
+                f"{' '.join(map(str, row))}\n"
+                for position, t, row in zip(positions, doc['time'], rows)
+            ]).encode(_ENCODING)
+        return format_event_page
 
     def event(self, doc):
-        if (self._baseline_descriptor and
-                doc['descriptor'] == self._baseline_descriptor['uid']):
-            self._num_baseline_events_received += 1
-            self._baseline_event = doc
-            return
+        getattr(self, self._event_dispatch.get(doc['descriptor'],
+                                               '_handle_unknown'))(doc)
+
+    def _handle_baseline(self, doc):
+        self._num_baseline_events_received += 1
+        if self._has_not_written_scan_header:
+            self._baseline_positions = _format_positioner_positions(doc)
+
+    def _start_primary_stream(self, descriptor_uid):
         # Write the scan header as soon as we get the first event.  If it is
         # not the baseline event, then sorry! You need to give me that before
         # any primary events.
@@ -513,38 +706,76 @@ class Serializer(event_model.DocumentRouter):
             # maybe write a new file header if there is not one already
             self._write_new_header()
             self._has_not_written_file_header = False
+        # This is deferred until the first primary Event so that, as before,
+        # runs we cannot convert (e.g. scans with several motors) only raise
+        # if they actually produce primary data.
+        self._cached_motor_name = _get_motor_name(self._start)
+        self._cached_acq_time = _get_acq_time(self._start)
+        self._cached_data_keys = tuple(_get_scan_data_column_names(
+            self._start, self._primary_descriptor))
+        self._format_event = self._make_event_formatter()
+        self._format_event_page = self._make_event_page_formatter()
         if self._has_not_written_scan_header:
             # write the scan header with whatever information we currently have
-            scan_header = to_spec_scan_header(self._start,
-                                              self._primary_descriptor,
-                                              self._baseline_event)
-            self._file.write(scan_header)
+            scan_header = _render_scan_header(
+                self._start['scan_id'],
+                _get_spec_command(self._start, self._cached_motor_name,
+                                  self._cached_acq_time),
+                to_spec_time_fast(self._start['time']),
+                self._cached_acq_time,
+                self._baseline_positions,
+                self._cached_motor_name,
+                self._cached_data_keys)
+            self._write(scan_header.encode(_ENCODING))
             self._has_not_written_scan_header = False
+        # All further primary events go straight to _handle_primary and
+        # _handle_primary_page.
+        self._event_dispatch[descriptor_uid] = '_handle_primary'
+        self._event_page_dispatch[descriptor_uid] = '_handle_primary_page'
 
-        if doc['descriptor'] != self._primary_descriptor['uid']:
-            err_msg = (
-                "The DocumentToSpec callback is not designed to handle more "
-                "than one event stream.  If you need this functionality, please "
-                "request it at https://github.com/NSLS-II/suitcase/issues. "
-                "Until that time, this DocumentToSpec callback will raise a "
-                "NotImplementedError if you try to use it with two event "
-                "streams.")
-            raise NotImplementedError(err_msg)
+    def _handle_first_primary(self, doc):
+        self._start_primary_stream(doc['descriptor'])
+        self._handle_primary(doc)
+
+    def _handle_primary(self, doc):
         self._num_events_received += 1
         # now write the scan data line
-        scan_data_line = to_spec_scan_data(self._start,
-                                           self._primary_descriptor, doc)
-        self._file.write(scan_data_line + '\n')
-        if self._flush:
-            self._file.flush()
+        self._write(self._format_event(doc))
+
+    def _handle_unknown(self, doc):
+        err_msg = (
+            "The DocumentToSpec callback is not designed to handle more "
+            "than one event stream.  If you need this functionality, please "
+            "request it at https://github.com/NSLS-II/suitcase/issues. "
+            "Until that time, this DocumentToSpec callback will raise a "
+            "NotImplementedError if you try to use it with two event "
+            "streams.")
+        raise NotImplementedError(err_msg)
+
+    def event_page(self, doc):
+        getattr(self, self._event_page_dispatch.get(doc['descriptor'],
+                                                    '_handle_unknown'))(doc)
+
+    def _handle_baseline_page(self, doc):
+        for event in event_model.unpack_event_page(doc):
+            self._handle_baseline(event)
+
+    def _handle_first_primary_page(self, doc):
+        self._start_primary_stream(doc['descriptor'])
+        self._handle_primary_page(doc)
+
+    def _handle_primary_page(self, doc):
+        self._num_events_received += len(doc['seq_num'])
+        self._write(self._format_event_page(doc))
 
     def stop(self, doc):
         msg = '\n'
-        doc = doc.copy()
-        doc.setdefault('reason', 'No reason recorded.')
-        if doc['exit_status'] != 'success':
-            msg += ('#C Run exited with status: {exit_status}. Reason: '
-                    '{reason}'.format(**doc))
-        self._file.write(msg)
-        if self._flush:
-            self._file.flush()
+        exit_status = doc['exit_status']
+        if exit_status != 'success':
+            reason = doc.get('reason', 'No reason recorded.')
+            msg += (f'#C Run exited with status: {exit_status}. Reason: '
+                    f'{reason}')
+        self._write(msg.encode(_ENCODING))
+        if not self._flush:
+            # With flush=True, _write has already flushed everything.
+            self._flush_buffer()
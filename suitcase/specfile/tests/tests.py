@@ -1,9 +1,16 @@
+from datetime import datetime
+import gc
+import itertools
 import json
 from pkg_resources import resource_filename
 
 from bluesky.plans import count
+import event_model
 import pytest
-from suitcase.specfile import export, Serializer
+import weakref
+from suitcase.specfile import (export, Serializer, to_spec_time,
+                               to_spec_time_fast, SPEC_TIME_FORMAT)
+from suitcase.utils import MultiFileManager
 from suitcase.utils.tests.conftest import one_stream_multi_descriptors_plan
 
 
@@ -23,22 +30,52 @@ from suitcase.utils.tests.conftest import one_stream_multi_descriptors_plan
 # data_from_suitcase_v0.7.0, line by line.
 
 
+def _load_documents(example):
+    "Load the losslessly-stored (name, document) pairs of an example."
+    jsonl_filename = resource_filename('suitcase.specfile',
+                                       f'tests/documents/{example}.jsonl')
+    with open(jsonl_filename) as f:
+        return [json.loads(line) for line in f]
+
+
+def _load_legacy_lines(example):
+    "Load the archival specfile written by suitcase v0.7.0 for an example."
+    spec_filename = resource_filename(
+        'suitcase.specfile',
+        f'tests/data_from_suitcase_v0.7.0/{example}.spec')
+    with open(spec_filename) as f:
+        return f.readlines()
+
+
+def _pack_event_pages(documents):
+    "Pack each run of consecutive Events from one stream into an EventPage."
+    for (name, _), group in itertools.groupby(
+            documents, key=lambda item: (item[0], item[1].get('descriptor'))):
+        docs = [doc for _, doc in group]
+        if name == 'event':
+            yield 'event_page', event_model.pack_event_page(*docs)
+        else:
+            yield from ((name, doc) for doc in docs)
+
+
 @pytest.mark.parametrize('example', ['count_1', 'count_3', 'scan', 'rel_scan'])
-def test_against_legacy_implementation(example, tmp_path):
-    # Load example data from JSONL and re-serialize it as specfile.
-    with Serializer(tmp_path, file_prefix=f'{example}') as serializer:
-        jsonl_filename = resource_filename('suitcase.specfile',
-                                           f'tests/documents/{example}.jsonl')
-        with open(jsonl_filename) as f:
-            for line in f:
-                name, doc = json.loads(line)
-                serializer(name, doc)
-    spec_filename = resource_filename('suitcase.specfile',
-                                      f'tests/data_from_suitcase_v0.7.0/{example}.spec')
+@pytest.mark.parametrize('feed', ['events', 'event_pages'])
+@pytest.mark.parametrize('allowed_modes', [('a', 'ab'), ('a',)])
+def test_against_legacy_implementation(example, feed, allowed_modes,
+                                       tmp_path):
+    # Load example data from JSONL and re-serialize it as specfile, either
+    # as Events or packed into EventPages, through a manager that supports
+    # binary append or only text append.
+    documents = _load_documents(example)
+    if feed == 'event_pages':
+        documents = _pack_event_pages(documents)
+    manager = MultiFileManager(tmp_path, allowed_modes=allowed_modes)
+    with Serializer(manager, file_prefix=f'{example}') as serializer:
+        for name, doc in documents:
+            serializer(name, doc)
 
     # Load specfile output and archival copies of expected specfile output.
-    with open(spec_filename) as f:
-        expected_lines = f.readlines()
+    expected_lines = _load_legacy_lines(example)
     with open(tmp_path / f'{example}.spec') as f:
         actual_lines = f.readlines()
     assert actual_lines == expected_lines
@@ -48,6 +85,98 @@ def test_against_legacy_implementation(example, tmp_path):
     print('\n'.join(expected_lines))
 
 
+@pytest.mark.parametrize('columns', ['two', 'none'])
+@pytest.mark.parametrize('feed', ['events', 'event_pages'])
+def test_data_columns(columns, feed, tmp_path):
+    "Runs with several scalar data columns, or none at all."
+    documents = _load_documents('count_3')
+    primary, = [doc for name, doc in documents
+                if name == 'descriptor' and doc['name'] == 'primary']
+    if columns == 'two':
+        primary['data_keys']['a_det'] = dict(primary['data_keys']['det'],
+                                             object_name='a_det')
+        for name, doc in documents:
+            if name == 'event' and doc['descriptor'] == primary['uid']:
+                doc['data']['a_det'] = 10 * doc['seq_num']
+                doc['timestamps']['a_det'] = doc['timestamps']['det']
+    else:
+        # Non-scalar data is left out of the specfile.
+        primary['data_keys']['det']['shape'] = [1]
+    if feed == 'event_pages':
+        documents = _pack_event_pages(documents)
+    with Serializer(tmp_path, file_prefix='count_3') as serializer:
+        for name, doc in documents:
+            serializer(name, doc)
+    with open(tmp_path / 'count_3.spec') as f:
+        actual_lines = f.readlines()
+
+    expected_lines = _load_legacy_lines('count_3')
+    assert expected_lines[11:14] == [
+        '#N 4\n', '#L seq_num  Epoch  Seconds  det\n',
+        '1  1551888078 -1 0.6065306597126334\n']
+    if columns == 'two':
+        expected_lines[11] = '#N 5\n'
+        expected_lines[12] = '#L seq_num  Epoch  Seconds  a_det  det\n'
+        for seq_num, i in enumerate([13, 15, 17], start=1):
+            expected_lines[i] = (f'{seq_num}  1551888078 -1 {10 * seq_num} '
+                                 f'0.6065306597126334\n')
+    else:
+        expected_lines[11] = '#N 3\n'
+        expected_lines[12] = '#L seq_num  Epoch  Seconds  \n'
+        for seq_num, i in enumerate([13, 15, 17], start=1):
+            expected_lines[i] = f'{seq_num}  1551888078 -1 \n'
+    assert actual_lines == expected_lines
+
+
+@pytest.mark.parametrize('allowed_modes', [('a', 'ab'), ('a',)])
+def test_non_ascii_owner(allowed_modes, tmp_path):
+    "Non-ASCII metadata round-trips through binary and text append mode."
+    documents = _load_documents('count_3')
+    documents[0] = ('start', dict(documents[0][1], owner='Zoë Ångström'))
+    manager = MultiFileManager(tmp_path, allowed_modes=allowed_modes)
+    with Serializer(manager, file_prefix='count_3') as serializer:
+        for name, doc in documents:
+            serializer(name, doc)
+    # Binary mode always writes UTF-8; text mode uses the locale's encoding.
+    encoding = 'utf-8' if 'ab' in allowed_modes else None
+    with open(tmp_path / 'count_3.spec', encoding=encoding) as f:
+        actual_lines = f.readlines()
+    expected_lines = _load_legacy_lines('count_3')
+    expected_lines[3] = '#C Zoë Ångström  User = Zoë Ångström\n'
+    assert actual_lines == expected_lines
+
+
+def test_run_without_stop(tmp_path):
+    "Buffered lines of a run without a RunStop stay in that run's file."
+    documents = _load_documents('count_3')
+    first_start = documents[0][1]
+    second_start = dict(first_start, uid='second')
+    with Serializer(tmp_path) as serializer:
+        for name, doc in documents:
+            if name != 'stop':
+                serializer(name, doc)
+        serializer('start', second_start)
+    with open(tmp_path / f"{first_start['uid']}.spec") as f:
+        first_lines = f.readlines()
+    with open(tmp_path / 'second.spec') as f:
+        second_lines = f.readlines()
+    assert first_lines[0] == f"#F {first_start['uid']}.spec\n"
+    assert first_lines[-1].endswith(' -1 0.6065306597126334\n')
+    assert second_lines == []
+
+
+def test_flush(tmp_path):
+    "With flush=True each event line is on disk as soon as it is received."
+    documents = _load_documents('count_3')
+    with Serializer(tmp_path, file_prefix='count_3', flush=True) as serializer:
+        for name, doc in documents:
+            serializer(name, doc)
+            if name == 'event' and 'det' in doc['data']:
+                with open(tmp_path / 'count_3.spec') as f:
+                    assert f.read().endswith(
+                        f"{int(doc['time'])} -1 {doc['data']['det']}\n")
+
+
 def test_export(tmp_path, example_data):
     documents = example_data()
     try:
@@ -92,3 +221,45 @@ def test_file_prefix_formatting(file_prefix_list, example_data, tmp_path):
         unique_actual = set(str(artifact).split('/')[-1].partition('-')[0]
                             for artifact in artifacts['stream_data'])
         assert unique_actual == set([templated_file_prefix])
+
+
+@pytest.mark.parametrize('timestamp', [0, 1551888078.2004945, 1455908495,
+                                       1704067199.999, 1551888078.9999997])
+def test_to_spec_time(timestamp):
+    expected = datetime.fromtimestamp(timestamp).strftime(SPEC_TIME_FORMAT)
+    assert to_spec_time(datetime.fromtimestamp(timestamp)) == expected
+    assert to_spec_time_fast(timestamp) == expected
+
+
+def test_no_reference_cycles(tmp_path):
+    "A Serializer is freed as soon as it is released, without the cyclic GC."
+    documents = _load_documents('scan')
+    gc.disable()
+    try:
+        with Serializer(tmp_path) as serializer:
+            for name, doc in documents:
+                serializer(name, doc)
+        ref = weakref.ref(serializer)
+        del serializer
+        assert ref() is None
+    finally:
+        gc.enable()
+
+
+def test_multi_motor_scan(tmp_path):
+    "Scans with several motors only raise once they produce primary data."
+    documents = _load_documents('scan')
+    start = dict(documents[0][1], motors=['motor', 'motor2'])
+    primary, = [doc for name, doc in documents
+                if name == 'descriptor' and doc['name'] == 'primary']
+    without_primary_events = [
+        (name, doc) for name, doc in [('start', start)] + documents[1:]
+        if not (name == 'event' and doc['descriptor'] == primary['uid'])]
+    with Serializer(tmp_path, file_prefix='no_events') as serializer:
+        for name, doc in without_primary_events:
+            serializer(name, doc)
+
+    with pytest.raises(NotImplementedError):
+        with Serializer(tmp_path, file_prefix='events') as serializer:
+            for name, doc in [('start', start)] + documents[1:]:
+                serializer(name, doc)